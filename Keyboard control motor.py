@@ -1,6 +1,7 @@
 import nidaqmx
 from nidaqmx.constants import LineGrouping, FrequencyUnits, Level, AcquisitionType
-import time
+import threading
+import numpy as np
 import keyboard   # <-- for arrow-key control
 
 DEV = "myDAQ1"
@@ -20,13 +21,17 @@ f_target = 8000       # Hz (change as needed)
 f_slow = 1200
 duty_cycle = 0.5
 
+# Pre-built DO payloads (avoid a list → buffer conversion on every write)
+_HI = np.array([True], dtype=bool)
+_LO = np.array([False], dtype=bool)
+
 
 # ------------------------------
 # Enable driver
 # ------------------------------
 en_task = nidaqmx.Task()
 en_task.do_channels.add_do_chan(EN_LINE, line_grouping=LineGrouping.CHAN_PER_LINE)
-en_task.write([False])    # EN = LOW → driver enabled
+en_task.write(_LO)    # EN = LOW → driver enabled
 
 # ------------------------------
 # Direction control task
@@ -36,74 +41,95 @@ dir_task.do_channels.add_do_chan(DIR_LINE, line_grouping=LineGrouping.CHAN_PER_L
 
 
 # ------------------------------
-# Function to start hardware pulse
+# Pulse task (created once, retuned + started/stopped per key press)
+# ------------------------------
+pulse_task = nidaqmx.Task()
+pulse_task.co_channels.add_co_pulse_chan_freq(
+    counter=STEP_COUNTER,
+    units=FrequencyUnits.HZ,
+    freq=f_slow,
+    duty_cycle=duty_cycle,
+    idle_state=Level.LOW
+)
+pulse_task.timing.cfg_implicit_timing(sample_mode=AcquisitionType.CONTINUOUS)
+
+
 # ------------------------------
-def start_pulse(freq):
-    t = nidaqmx.Task()
-    t.co_channels.add_co_pulse_chan_freq(
-        counter=STEP_COUNTER,
-        units=FrequencyUnits.HZ,
-        freq=freq,
-        duty_cycle=duty_cycle,
-        idle_state=Level.LOW
-    )
-    t.timing.cfg_implicit_timing(sample_mode=AcquisitionType.CONTINUOUS)
-    t.start()
-    return t
+# KEY HANDLERS
+# ------------------------------
+pulse_freq = None               # frequency currently being output (None = stopped)
+last_dir = None                 # last level written to DIR (skip redundant writes)
+pulse_lock = threading.Lock()   # guards pulse state across hook callbacks
+
+held_arrows = []                # arrow keys currently held, tracked from the hook events
+
+# Arrow key -> (DIR level, frequency). DIR = LOW → CW, HIGH → CCW
+ARROW_JOGS = {
+    "down": (False, f_target),   # CW fast
+    "up": (True, f_target),      # CCW fast
+    "right": (True, f_slow),     # CCW slow
+    "left": (False, f_slow),     # CW slow
+}
+
+
+def _jog(dir_high, freq):
+    # caller holds pulse_lock
+    global pulse_freq, last_dir
+    if dir_high != last_dir:
+        dir_task.write(_HI if dir_high else _LO)
+        last_dir = dir_high
+    if freq != pulse_freq:
+        pulse_task.stop()
+        pulse_task.co_channels[0].co_pulse_freq = freq
+        pulse_task.start()
+        pulse_freq = freq
+
+
+def _set_dir_and_start(key):
+    with pulse_lock:
+        if key not in held_arrows:
+            held_arrows.append(key)
+        _jog(*ARROW_JOGS[key])
+
+
+def _stop_pulse(key):
+    global pulse_freq
+    with pulse_lock:
+        if key in held_arrows:
+            held_arrows.remove(key)
+        # Another arrow still held → go back to the most recently pressed one
+        if held_arrows:
+            _jog(*ARROW_JOGS[held_arrows[-1]])
+            return
+        if pulse_freq is not None:
+            pulse_task.stop()
+            pulse_freq = None
+
+
+for key in ARROW_JOGS:
+    keyboard.on_press_key(key, lambda e, key=key: _set_dir_and_start(key))
+    keyboard.on_release_key(key, lambda e, key=key: _stop_pulse(key))
 
 
 # ------------------------------
-# MAIN CONTROL LOOP
+# MAIN
 # ------------------------------
-pulse_task = None
 print("\nMotor ready. Hold UP/DOWN to move. Press ESC to quit.\n")
 
 try:
-    while True:
-
-        # EXIT
-        if keyboard.is_pressed("esc"):
-            break
-
-        # MOVE CW fast (DOWN ARROW)
-        if keyboard.is_pressed("down"):
-            dir_task.write([False])   # DIR = LOW → CW
-            if pulse_task is None:
-                pulse_task = start_pulse(f_target)
-        # MOVE CCW fast (UP ARROW)
-        elif keyboard.is_pressed("up"):
-            dir_task.write([True])    # DIR = HIGH → CCW
-            if pulse_task is None:
-                pulse_task = start_pulse(f_target)
-         # MOVE CCW slow (Right ARROW)
-        elif keyboard.is_pressed("right"):
-            dir_task.write([True])    # DIR = HIGH → CCW
-            if pulse_task is None:
-                pulse_task = start_pulse(f_slow)
-         # MOVE CW (LEFT ARROW)
-        elif keyboard.is_pressed("left"):
-            dir_task.write([False])    # DIR = LOW → CW
-            if pulse_task is None:
-                pulse_task = start_pulse(f_slow)
-        else:
-            # No key pressed → stop pulse
-            if pulse_task is not None:
-                pulse_task.stop()
-                pulse_task.close()
-                pulse_task = None
-
-        time.sleep(0.01)  # small loop delay
+    keyboard.wait("esc")   # block here; the hooks above drive the motor
 
 finally:
+    keyboard.unhook_all()
+
     # Stop everything safely
-    if pulse_task is not None:
+    with pulse_lock:
         pulse_task.stop()
         pulse_task.close()
 
-    en_task.write([True])   # EN = HIGH → disable driver
+    en_task.write(_HI)   # EN = HIGH → disable driver
     en_task.close()
     dir_task.close()
 
     print("\nDriver disabled. Program finished.")
 
-
@@ -1,9 +1,11 @@
 import time
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter import filedialog
 
 
+import numpy as np
 import nidaqmx
 from nidaqmx.constants import (
     TerminalConfiguration,
@@ -12,6 +14,7 @@ from nidaqmx.constants import (
     Level,
     AcquisitionType,
 )
+from nidaqmx.stream_readers import AnalogSingleChannelReader
 
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
@@ -33,6 +36,26 @@ V_FULL_SCALE = 10.0
 LOAD_FULL_SCALE = 1000.0
 CAL_FACTOR = 2.0
 SAMPLE_INTERVAL = 0.1   # seconds
+SAMPLE_INTERVAL_MS = int(SAMPLE_INTERVAL * 1000)
+FORCE_LB_PER_VOLT = LOAD_FULL_SCALE / V_FULL_SCALE * CAL_FACTOR
+
+# Load cell acquisition (hardware-timed, continuous)
+AI_RATE = 1000.0            # samples / s
+AI_CALLBACK_SAMPLES = 50    # driver callback every 50 samples
+AI_RING_SIZE = 1000         # last 1 s of raw samples (multiple of AI_CALLBACK_SAMPLES)
+ZERO_SAMPLES = 50           # samples averaged when re-zeroing
+EMA_ALPHA = 0.02            # per-sample smoothing of the reading (~50 ms time constant)
+
+# EMA_ALPHA applied across one callback block as a single dot product
+_EMA_WEIGHTS = EMA_ALPHA * (1 - EMA_ALPHA) ** np.arange(AI_CALLBACK_SAMPLES - 1, -1, -1)
+_EMA_DECAY = (1 - EMA_ALPHA) ** AI_CALLBACK_SAMPLES
+
+# Graph/test sample buffers start at this many samples and double when full
+SAMPLE_BUFFER_SIZE = 1024
+# Most points handed to matplotlib; longer runs are decimated for display only
+MAX_PLOT_POINTS = 2000
+# Headroom (fraction of data span) added each time autoscale has to grow the view
+AUTOSCALE_MARGIN = 0.1
 
 # Motor mechanical configuration
 STEPPER_STEPS = 200
@@ -57,6 +80,10 @@ F_FAST = 8000.0
 F_SLOW = 1200.0
 DUTY   = 0.5
 
+# Pre-built DO payloads (avoid a list → buffer conversion on every write)
+_HI = np.array([True], dtype=bool)
+_LO = np.array([False], dtype=bool)
+
 
 
 # ============================================
@@ -74,14 +101,22 @@ class TestMachineApp:
         # DAQ state
         self.zero_offset = 0.0
         self.ai_task = None
+        self._ai_reader = None
+        self._ai_block = np.empty(AI_CALLBACK_SAMPLES)
+        self._ai_ring = np.zeros(AI_RING_SIZE)
+        self._ai_count = 0                  # total samples written to the ring
+        self._ai_error = None               # exception raised in the DAQ callback
+        self._ema = None                    # smoothed load cell voltage
         self.en_task = None
         self.dir_task = None
         self.pulse_task = None
+        self._pulse_freq = None          # freq the counter is running at (None = stopped)
+        self._last_dir_written = None
 
         # Machine state variables
         self.current_freq = 0.0
         self.current_dir = 0
-        self.pulse_accumulator = 0.0
+        self._travel_rate_in_per_s = 0.0    # signed travel speed, set on motor start/stop
         self.current_force = 0.0
         self.current_travel_in = 0.0
         self.last_update_time = None
@@ -92,8 +127,14 @@ class TestMachineApp:
         self.line_force = None
         self.scatter_force = None
         self.canvas = None
-        self.travel_data = []
-        self.force_data = []
+        self._bg = None                                 # cached axes background for blitting
+        self._repaint_pending = False                   # an idle repaint is already queued
+        self._n = 0                                     # samples in the graph buffers
+        self._travel_np = np.empty(SAMPLE_BUFFER_SIZE)
+        self._force_np = np.empty(SAMPLE_BUFFER_SIZE)
+        self._plot_stride = 1                           # display decimation (power of 2)
+        self._data_xmin = self._data_ymin = np.inf      # running extents of graph data
+        self._data_xmax = self._data_ymax = -np.inf
         self.graph_start_travel_offset = 0.0
         self.graph_start_force_offset = 0.0
 
@@ -101,10 +142,12 @@ class TestMachineApp:
         self.test_active = False
         self.export_csv = tk.BooleanVar(value=True)
         self.export_png = tk.BooleanVar(value=True)
-        self.test_time_data = []
-        self.test_force_data = []
-        self.test_travel_data = []
+        self._test_n = 0                                # samples in the test buffers
+        self._test_time_np = np.empty(SAMPLE_BUFFER_SIZE)
+        self._test_force_np = np.empty(SAMPLE_BUFFER_SIZE)
+        self._test_travel_np = np.empty(SAMPLE_BUFFER_SIZE)
         self.test_start_time = None
+        self._io_pool = ThreadPoolExecutor(max_workers=1)   # background file writes
 
 
         # Axis settings
@@ -114,8 +157,15 @@ class TestMachineApp:
         self.ymin = 0.0
         self.ymax = 100.0
 
+        # Last text written to each live readout (skip unchanged StringVar sets)
+        self._last_labels = {"mf": "", "mt": "", "gf": "", "gt": ""}
+
         # Default test mode = COMPRESSION
         self.test_mode_var = tk.StringVar(value="Compression")
+        self._is_compression = True
+        self._force_sign = -1
+        self._travel_sign = -1
+        self.test_mode_var.trace_add("write", self._on_mode_change)
 
         # Build UI + DAQ
         self._build_ui()
@@ -123,7 +173,7 @@ class TestMachineApp:
         self._create_graph()
 
         # Start update loop
-        self.root.after(int(SAMPLE_INTERVAL * 1000), self.update_loop)
+        self.root.after(SAMPLE_INTERVAL_MS, self.update_loop)
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
 
@@ -287,6 +337,20 @@ class TestMachineApp:
 
 
 
+    def _on_mode_change(self, *args):
+        """Cache the selected test type and its sign flip."""
+        self._is_compression = self.test_mode_var.get() == "Compression"
+        if self._is_compression:
+            self._force_sign = -1
+            self._travel_sign = -1
+        else:
+            self._force_sign = +1
+            self._travel_sign = +1
+
+
+
+
+
     # ============================================
     # DAQ INITIALIZATION
     # ============================================
@@ -304,16 +368,27 @@ class TestMachineApp:
         )
 
         print("Calibrating zero offset…")
-        zeros = [self.ai_task.read() for _ in range(50)]
-        self.zero_offset = sum(zeros) / len(zeros)
+        self.zero_offset = self._read_zero_offset()
         print(f"Zero offset = {self.zero_offset:.6f} V")
 
+        # Continuous acquisition; the driver callback keeps the ring buffer filled
+        self.ai_task.timing.cfg_samp_clk_timing(
+            rate=AI_RATE,
+            sample_mode=AcquisitionType.CONTINUOUS,
+            samps_per_chan=AI_RING_SIZE
+        )
+        self._ai_reader = AnalogSingleChannelReader(self.ai_task.in_stream)
+        self.ai_task.register_every_n_samples_acquired_into_buffer_event(
+            AI_CALLBACK_SAMPLES, self._on_ai_samples
+        )
+        self.ai_task.start()
+
         # ---- Enable line (ACTIVE LOW) ----
         self.en_task = nidaqmx.Task()
         self.en_task.do_channels.add_do_chan(
             EN_LINE, line_grouping=LineGrouping.CHAN_PER_LINE
         )
-        self.en_task.write([False])   # enable motor driver
+        self.en_task.write(_LO)   # enable motor driver
 
         # ---- Direction line ----
         self.dir_task = nidaqmx.Task()
@@ -321,7 +396,66 @@ class TestMachineApp:
             DIR_LINE, line_grouping=LineGrouping.CHAN_PER_LINE
         )
 
-        self.pulse_task = None
+        # ---- Step pulses: one counter task, retuned + started/stopped on demand ----
+        self.pulse_task = nidaqmx.Task()
+        self.pulse_task.co_channels.add_co_pulse_chan_freq(
+            counter=STEP_COUNTER,
+            units=FrequencyUnits.HZ,
+            freq=F_SLOW,
+            duty_cycle=DUTY,
+            idle_state=Level.LOW
+        )
+        self.pulse_task.timing.cfg_implicit_timing(AcquisitionType.CONTINUOUS)
+
+
+
+
+
+    def _on_ai_samples(self, task_handle, event_type, number_of_samples, callback_data):
+        """DAQmx callback (driver thread): copy the newest samples into the ring."""
+        try:
+            self._ai_reader.read_many_sample(
+                self._ai_block, number_of_samples_per_channel=AI_CALLBACK_SAMPLES
+            )
+        except Exception as e:
+            self._ai_error = e
+            return 0
+
+        start = self._ai_count % AI_RING_SIZE
+        self._ai_ring[start:start + AI_CALLBACK_SAMPLES] = self._ai_block
+        self._ai_count += AI_CALLBACK_SAMPLES
+
+        # Exponential moving average over the block (seeded by the first sample)
+        ema = self._ai_block[0] if self._ema is None else self._ema
+        self._ema = float(_EMA_DECAY * ema + _EMA_WEIGHTS @ self._ai_block)
+        return 0
+
+    def _read_zero_offset(self, n=ZERO_SAMPLES):
+        """Average n hardware-timed samples into a zero offset (volts).
+
+        Before the continuous acquisition is running this is a single finite
+        read; afterwards it averages the newest samples already in the ring.
+        """
+        if self._ai_reader is None:
+            self.ai_task.timing.cfg_samp_clk_timing(
+                rate=AI_RATE,
+                sample_mode=AcquisitionType.FINITE,
+                samps_per_chan=n
+            )
+            data = self.ai_task.read(number_of_samples_per_channel=n)
+            return float(np.mean(data))
+        return self._recent_voltage(n)
+
+    def _recent_voltage(self, n):
+        """Mean of the newest n ring samples, or None before the first callback."""
+        count = self._ai_count
+        if count == 0:
+            return None
+        n = min(n, count, AI_RING_SIZE)
+        end = count % AI_RING_SIZE
+        if end >= n:
+            return float(self._ai_ring[end - n:end].mean())
+        return float((self._ai_ring[:end].sum() + self._ai_ring[end - n:].sum()) / n)
 
 
 
@@ -338,12 +472,14 @@ class TestMachineApp:
         self.ax.set_ylabel("Force (lb)")
         self.ax.grid(True)
 
-        (self.line_force,) = self.ax.plot([], [], "b-", label="Force vs Travel")
-        (self.scatter_force,) = self.ax.plot([], [], "ro", markersize=3)
+        # Data artists are animated: full draws skip them and they are blitted instead
+        (self.line_force,) = self.ax.plot([], [], "b-", label="Force vs Travel", animated=True)
+        (self.scatter_force,) = self.ax.plot([], [], "ro", markersize=3, animated=True)
         self.ax.legend(loc="best")
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.root)
         self.canvas.get_tk_widget().pack(side="right", fill="both", expand=True)
+        self.canvas.mpl_connect("draw_event", self._on_canvas_draw)
 
         self.fig.subplots_adjust(bottom=0.3)
         self.fig.tight_layout()
@@ -353,6 +489,25 @@ class TestMachineApp:
         self.reset_graph()
 
 
+    def _on_canvas_draw(self, event):
+        """After every full redraw, re-capture the static background for blitting."""
+        if self.canvas.is_saving():
+            return
+        self._bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line_force)
+        self.ax.draw_artist(self.scatter_force)
+
+    def _blit_graph(self):
+        """Repaint only the data artists over the cached background."""
+        if self._bg is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._bg)
+        self.ax.draw_artist(self.line_force)
+        self.ax.draw_artist(self.scatter_force)
+        self.canvas.blit(self.ax.bbox)
+
+
 
     # ============================================
     # RESET GRAPH – force remains correct
@@ -360,8 +515,10 @@ class TestMachineApp:
 
     def reset_graph(self):
         """Reset travel to zero but KEEP force equal to absolute force."""
-        self.travel_data = []
-        self.force_data = []
+        self._n = 0
+        self._plot_stride = 1
+        self._data_xmin = self._data_ymin = np.inf
+        self._data_xmax = self._data_ymax = -np.inf
 
         # Travel resets to zero
         self.graph_start_travel_offset = self.current_travel_in
@@ -369,19 +526,14 @@ class TestMachineApp:
         # Force stays absolute — do NOT zero it
         self.graph_start_force_offset = 0.0
 
-        force_sign = -1 if self.test_mode_var.get() == "Compression" else 1
-        abs_force = force_sign * self.current_force
+        abs_force = self._force_sign * self.current_force
 
         # Update graph status labels
-        self.graph_force_var.set(f"Force: {abs_force:0.2f} lb")
-        self.graph_travel_var.set("Travel: 0.0000 in")
-
-        # Clear the plot
-        self.line_force.set_data([], [])
-        self.scatter_force.set_data([], [])
-        self.ax.relim()
-        self.ax.autoscale_view()
-        self.canvas.draw_idle()
+        self._set_label("gf", self.graph_force_var, f"Force: {abs_force:0.2f} lb")
+        self._set_label("gt", self.graph_travel_var, "Travel: 0.0000 in")
+
+        # Clear the plot (one coalesced repaint)
+        self._schedule_repaint()
 
 
     # ============================================
@@ -441,6 +593,7 @@ class TestMachineApp:
                 self.ymin = float(y_min_entry.get())
                 self.ymax = float(y_max_entry.get())
                 win.destroy()
+                self._schedule_repaint()
             except ValueError:
                 messagebox.showerror("Invalid input", "Please enter numeric limits.")
 
@@ -456,11 +609,9 @@ class TestMachineApp:
         self.reset_graph()
 
         # Reset test data
-        self.test_time_data = []
-        self.test_force_data = []
-        self.test_travel_data = []
+        self._test_n = 0
 
-        self.test_start_time = time.time()
+        self.test_start_time = time.perf_counter()
         self.test_active = True
 
         self.test_status_var.set("Status: Test Running")
@@ -478,22 +629,20 @@ class TestMachineApp:
             self.fat_result.set("Result: Invalid travel value")
             return
 
-        if not self.travel_data:
+        n = self._n
+        if n == 0:
             self.fat_result.set("Result: No data")
             return
 
         # --- Find distances of all points from target ---
-        distances = [(abs(travel - target), idx) for idx, travel in enumerate(self.travel_data)]
-
-        # --- Sort by closest distance ---
-        distances.sort(key=lambda x: x[0])
+        distances = np.abs(self._travel_np[:n] - target)
 
-        # --- Get indices of the 4 closest points ---
-        closest_indices = [idx for (_, idx) in distances[:4]]
+        # --- Get indices of the 4 closest points (partial sort, O(N)) ---
+        k = min(4, n)
+        closest_indices = np.argpartition(distances, k - 1)[:k]
 
         # --- Compute average force for these points ---
-        closest_forces = [self.force_data[i] for i in closest_indices]
-        avg_force = sum(closest_forces) / len(closest_forces)
+        avg_force = float(self._force_np[closest_indices].mean())
 
         # Update label
         self.fat_result.set(f"Result: {avg_force:.2f} lb")
@@ -507,23 +656,21 @@ class TestMachineApp:
 
     def rezero_load_cell(self):
         """Re-zero the load cell and immediately update displays."""
-        try:
-            zeros = [self.ai_task.read() for _ in range(50)]
-            self.zero_offset = sum(zeros) / len(zeros)
-        except Exception as e:
-            messagebox.showerror("DAQ Error", f"Could not re-zero load cell:\n{e}")
+        v = self._read_zero_offset()
+        if v is None:
+            messagebox.showerror("DAQ Error", "Could not re-zero load cell:\nNo samples acquired yet")
             return
+        self.zero_offset = v
 
         # Reset force
         self.current_force = 0.0
 
         # Update absolute force display
-        force_sign = -1 if self.test_mode_var.get() == "Compression" else 1
-        self.machine_force_var.set(f"Force: {0.00 * force_sign:0.2f} lb")
+        self._set_label("mf", self.machine_force_var, f"Force: {0.00 * self._force_sign:0.2f} lb")
 
         # Update relative graph force
         self.graph_start_force_offset = 0.0
-        self.graph_force_var.set("Force: 0.00 lb")
+        self._set_label("gf", self.graph_force_var, "Force: 0.00 lb")
 
         messagebox.showinfo("Load Cell Zeroed", "Load cell has been re-zeroed.")
 
@@ -554,35 +701,40 @@ class TestMachineApp:
 
     def start_motor(self, direction: int, freq: float):
         """direction: +1 = UP (CCW), -1 = DOWN (CW)"""
-        self.current_dir = direction
-        self.current_freq = freq
+        # Already moving this way at this speed → nothing to send to the DAQ
+        if (direction == self.current_dir and freq == self.current_freq
+                and self._pulse_freq is not None):
+            return
 
-        # Set direction line
-        self.dir_task.write([True if direction > 0 else False])
-
-        if self.pulse_task is None:
-            self.pulse_task = nidaqmx.Task()
-            self.pulse_task.co_channels.add_co_pulse_chan_freq(
-                counter=STEP_COUNTER,
-                units=FrequencyUnits.HZ,
-                freq=freq,
-                duty_cycle=DUTY,
-                idle_state=Level.LOW
-            )
-            self.pulse_task.timing.cfg_implicit_timing(AcquisitionType.CONTINUOUS)
+        # Set direction line (only when it actually changes)
+        dir_high = direction > 0
+        if dir_high != self._last_dir_written:
+            self.dir_task.write(_HI if dir_high else _LO)
+            self._last_dir_written = dir_high
+
+        # Retune the persistent counter only when the speed changes
+        if freq != self._pulse_freq:
+            self.pulse_task.stop()
+            self.pulse_task.co_channels[0].co_pulse_freq = freq
             self.pulse_task.start()
+            self._pulse_freq = freq
+
+        # Record state last so a failed DAQ write doesn't leave it lying
+        self.current_dir = direction
+        self.current_freq = freq
+        self._travel_rate_in_per_s = direction * freq * TRAVEL_IN_PER_PULSE
 
     def stop_motor(self):
         self.current_freq = 0.0
         self.current_dir = 0
+        self._travel_rate_in_per_s = 0.0
 
-        if self.pulse_task:
+        if self.pulse_task and self._pulse_freq is not None:
             try:
                 self.pulse_task.stop()
-                self.pulse_task.close()
             except:
                 pass
-            self.pulse_task = None
+            self._pulse_freq = None
 
 
 
@@ -591,81 +743,164 @@ class TestMachineApp:
     # ============================================
 
     def update_loop(self):
-        now = time.time()
+        now = time.perf_counter()
         dt = SAMPLE_INTERVAL if self.last_update_time is None else (now - self.last_update_time)
         self.last_update_time = now
 
-        # Read load cell
-        try:
-            v = self.ai_task.read()
-        except Exception:
+        # Read load cell (latest samples from the background acquisition)
+        if self._ai_error is not None:
             self.on_close()
             return
 
-        self.current_force = ((v - self.zero_offset) / V_FULL_SCALE) * LOAD_FULL_SCALE
-        self.current_force *= CAL_FACTOR
+        v = self._ema
+        if v is not None:
+            self.current_force = (v - self.zero_offset) * FORCE_LB_PER_VOLT
 
         # Travel update
-        if self.current_freq > 0 and self.current_dir != 0:
-            self.pulse_accumulator += self.current_dir * self.current_freq * dt
+        self.current_travel_in += self._travel_rate_in_per_s * dt
 
-        self.current_travel_in = self.pulse_accumulator * TRAVEL_IN_PER_PULSE
-
-        # Mode sign flip
-        if self.test_mode_var.get() == "Compression":
-            force_sign = -1
-            travel_sign = -1
-        else:
-            force_sign = +1
-            travel_sign = +1
+        # Mode sign flip (cached by _on_mode_change)
+        force_sign = self._force_sign
+        travel_sign = self._travel_sign
 
         # Absolute readings
         abs_force = force_sign * self.current_force
         abs_travel = travel_sign * self.current_travel_in
-        self.machine_force_var.set(f"Force: {abs_force:0.2f} lb")
-        self.machine_travel_var.set(f"Travel: {abs_travel:0.4f} in")
+        self._set_label("mf", self.machine_force_var, f"Force: {abs_force:0.2f} lb")
+        self._set_label("mt", self.machine_travel_var, f"Travel: {abs_travel:0.4f} in")
 
         # Relative readings
         rel_force = force_sign * (self.current_force - self.graph_start_force_offset)
         rel_travel = travel_sign * (self.current_travel_in - self.graph_start_travel_offset)
-        self.graph_force_var.set(f"Force: {rel_force:0.2f} lb")
-        self.graph_travel_var.set(f"Travel: {rel_travel:0.4f} in")
+        self._set_label("gf", self.graph_force_var, f"Force: {rel_force:0.2f} lb")
+        self._set_label("gt", self.graph_travel_var, f"Travel: {rel_travel:0.4f} in")
 
         # -----------------------------------
-        # Test recording
+        # Graph update + test recording
         # -----------------------------------
-        if self.test_active:
-            elapsed = now - self.test_start_time
-            self.test_time_data.append(elapsed)
-            self.test_force_data.append(rel_force)
-            self.test_travel_data.append(rel_travel)
+        elapsed = now - self.test_start_time if self.test_active else None
+        self._push(rel_travel, rel_force, elapsed)
 
+        n = self._n
+        ax = self.ax
 
-        # Graph update
-        self.travel_data.append(rel_travel)
-        self.force_data.append(rel_force)
-
-        self.line_force.set_data(self.travel_data, self.force_data)
-        self.scatter_force.set_data(self.travel_data, self.force_data)
+        # Plot a decimated view; stride only changes when n doubles past the cap
+        while n > self._plot_stride * MAX_PLOT_POINTS:
+            self._plot_stride *= 2
+        travel_plot, force_plot = self._plot_view()
+        self.line_force.set_data(travel_plot, force_plot)
+        self.scatter_force.set_data(travel_plot, force_plot)
 
         # Axis behavior
+        old_limits = (ax.get_xlim(), ax.get_ylim())
+        self._update_axis_limits()
+
+        # Full redraw only when the axes moved; otherwise just blit the data
+        if (ax.get_xlim(), ax.get_ylim()) != old_limits:
+            self.canvas.draw_idle()
+        else:
+            self._blit_graph()
+
+        # Repeat loop
+        self.root.after(SAMPLE_INTERVAL_MS, self.update_loop)
+
+    def _update_axis_limits(self, rescale=False):
+        """Apply the axis mode. Autoscale only grows the view when the newest
+        point falls outside it, unless rescale is True."""
+        n = self._n
         if self.axis_mode == 1:
-            self.ax.relim()
-            self.ax.autoscale_view()
+            if n == 0:
+                self.ax.relim()
+                self.ax.autoscale_view()
+                return
+            x = self._travel_np[n - 1]
+            y = self._force_np[n - 1]
+            xlo, xhi = self.ax.get_xlim()
+            ylo, yhi = self.ax.get_ylim()
+            if rescale or n == 1 or not (xlo <= x <= xhi and ylo <= y <= yhi):
+                self.ax.set_xlim(self._padded(self._data_xmin, self._data_xmax))
+                self.ax.set_ylim(self._padded(self._data_ymin, self._data_ymax))
         elif self.axis_mode == 2:
             self.ax.set_xlim(self.xmin, self.xmax)
             self.ax.set_ylim(self.ymin, self.ymax)
         elif self.axis_mode == 3:
             self.ax.set_ylim(self.ymin, self.ymax)
-            self.ax.set_xlim(min(self.travel_data), max(self.travel_data))
+            if n:
+                self.ax.set_xlim(self._data_xmin, self._data_xmax)
         elif self.axis_mode == 4:
             self.ax.set_xlim(self.xmin, self.xmax)
-            self.ax.set_ylim(min(self.force_data), max(self.force_data))
-
+            if n:
+                self.ax.set_ylim(self._data_ymin, self._data_ymax)
+
+    def _schedule_repaint(self):
+        """Queue one full graph repaint for when Tk is idle (repeat calls coalesce)."""
+        if not self._repaint_pending:
+            self._repaint_pending = True
+            self.root.after_idle(self._do_repaint)
+
+    def _do_repaint(self):
+        self._repaint_pending = False
+        travel_plot, force_plot = self._plot_view()
+        self.line_force.set_data(travel_plot, force_plot)
+        self.scatter_force.set_data(travel_plot, force_plot)
+        self._update_axis_limits(rescale=True)
         self.canvas.draw_idle()
 
-        # Repeat loop
-        self.root.after(int(SAMPLE_INTERVAL * 1000), self.update_loop)
+    def _plot_view(self):
+        """Strided (travel, force) for the graph, always ending on the newest sample."""
+        n = self._n
+        stride = self._plot_stride
+        travel = self._travel_np[:n:stride]
+        force = self._force_np[:n:stride]
+        if n and (n - 1) % stride:
+            travel = np.append(travel, self._travel_np[n - 1])
+            force = np.append(force, self._force_np[n - 1])
+        return travel, force
+
+    @staticmethod
+    def _padded(lo, hi):
+        """Axis limits around [lo, hi] with AUTOSCALE_MARGIN headroom each side."""
+        span = hi - lo
+        pad = span * AUTOSCALE_MARGIN if span > 0 else max(abs(lo), 1.0) * AUTOSCALE_MARGIN
+        return lo - pad, hi + pad
+
+    def _set_label(self, key, var, text):
+        """Set a readout StringVar only when its text actually changes."""
+        if text != self._last_labels[key]:
+            var.set(text)
+            self._last_labels[key] = text
+
+    def _push(self, rel_travel, rel_force, elapsed=None):
+        """Append a sample to the graph buffers, and to the test buffers if elapsed is given."""
+        n = self._n
+        if n == self._travel_np.shape[0]:
+            self._travel_np = np.resize(self._travel_np, 2 * n)
+            self._force_np = np.resize(self._force_np, 2 * n)
+        self._travel_np[n] = rel_travel
+        self._force_np[n] = rel_force
+        self._n = n + 1
+
+        if rel_travel < self._data_xmin:
+            self._data_xmin = rel_travel
+        if rel_travel > self._data_xmax:
+            self._data_xmax = rel_travel
+        if rel_force < self._data_ymin:
+            self._data_ymin = rel_force
+        if rel_force > self._data_ymax:
+            self._data_ymax = rel_force
+
+        if elapsed is None:
+            return
+
+        n = self._test_n
+        if n == self._test_time_np.shape[0]:
+            self._test_time_np = np.resize(self._test_time_np, 2 * n)
+            self._test_force_np = np.resize(self._test_force_np, 2 * n)
+            self._test_travel_np = np.resize(self._test_travel_np, 2 * n)
+        self._test_time_np[n] = elapsed
+        self._test_force_np[n] = rel_force
+        self._test_travel_np[n] = rel_travel
+        self._test_n = n + 1
 
     # -----------------------------------
     # Export Results
@@ -674,7 +909,8 @@ class TestMachineApp:
     def export_results(self):
         """Export CSV and PNG only when the user presses the button."""
 
-        if not self.test_time_data:
+        n = self._test_n
+        if n == 0:
             messagebox.showwarning("No Data", "No test data available to export.")
             return
 
@@ -682,13 +918,14 @@ class TestMachineApp:
         if self.export_csv.get():
             filename = f"test_data_{int(time.time())}.csv"
             full_path = os.path.join(self.export_folder, filename)
-            try:
-                with open(full_path, "w") as f:
-                    f.write("time,travel,force\n")
-                    for t, tr, fr in zip(self.test_time_data, self.test_travel_data, self.test_force_data):
-                        f.write(f"{t},{tr},{fr}\n")
-            except Exception as e:
-                messagebox.showerror("CSV Error", f"Could not save CSV:\n{e}")
+            data = np.column_stack(
+                [self._test_time_np[:n], self._test_travel_np[:n], self._test_force_np[:n]]
+            )
+            future = self._io_pool.submit(
+                np.savetxt, full_path, data, delimiter=",", fmt="%.9g",
+                header="time,travel,force", comments=""
+            )
+            self._check_export(future, "CSV Error", "Could not save CSV")
 
         # --- Export PNG ---
         if self.export_png.get():
@@ -699,6 +936,15 @@ class TestMachineApp:
             except Exception as e:
                 messagebox.showerror("PNG Error", f"Could not save graph image:\n{e}")
 
+    def _check_export(self, future, title, message):
+        """Poll a background export from the Tk loop and report any failure."""
+        if not future.done():
+            self.root.after(100, self._check_export, future, title, message)
+            return
+        e = future.exception()
+        if e is not None:
+            messagebox.showerror(title, f"{message}:\n{e}")
+
     # -----------------------------------
     # Export Results Folder Selection
     # -----------------------------------
@@ -722,9 +968,15 @@ class TestMachineApp:
     def on_close(self):
         self.stop_motor()
 
+        if self.pulse_task:
+            try:
+                self.pulse_task.close()
+            except:
+                pass
+
         if self.en_task:
             try:
-                self.en_task.write([True])
+                self.en_task.write(_HI)
                 self.en_task.close()
             except:
                 pass
@@ -741,6 +993,9 @@ class TestMachineApp:
             except:
                 pass
 
+        # Let any pending export finish writing
+        self._io_pool.shutdown(wait=True)
+
         self.root.destroy()
 
 
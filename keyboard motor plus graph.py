@@ -10,11 +10,16 @@ Save as loadcell_and_motor.py and run from a terminal.
 import threading
 import time
 import collections
+import queue
 import sys
 
 import nidaqmx
 from nidaqmx.constants import TerminalConfiguration, LineGrouping, FrequencyUnits, Level, AcquisitionType
+from nidaqmx.stream_readers import AnalogSingleChannelReader
+from nidaqmx.stream_writers import DigitalSingleChannelWriter
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
 import keyboard  # Windows only (run script with appropriate privileges if needed)
 
 # ------------------------
@@ -27,9 +32,18 @@ TERMINAL_MODE = TerminalConfiguration.DIFF
 V_FULL_SCALE = 10.0           # SGA full-scale (±10 V typical)
 LOAD_FULL_SCALE = 1000.0      # load cell rating in lb (adjust if using different units)
 CAL_FACTOR = 2.0              # calibration multiplicative factor (adjust with calibration procedure)
+SCALE = LOAD_FULL_SCALE * CAL_FACTOR / V_FULL_SCALE   # lb per volt (after tare)
 
 SAMPLE_INTERVAL = 0.05        # seconds between samples for plotting (20 Hz)
-MOVING_AVG_SAMPLES = 5        # average to smooth jitter (increase if needed)
+PLOT_HISTORY = 5000           # most recent points kept on the live plot
+PLOT_BUFFER = 2 * PLOT_HISTORY   # preallocated plot storage; compacted when full
+RESCALE_INTERVAL = 1.0        # seconds between autoscale + full redraws of the live plot
+MOVING_AVG_SAMPLES = 5        # blocks averaged to smooth jitter (increase if needed)
+
+AI_RATE = 1000.0              # hardware sample clock (Hz)
+AI_BLOCK = int(AI_RATE * SAMPLE_INTERVAL)   # samples per driver callback / plot point (50)
+BLOCK_DT = AI_BLOCK / AI_RATE   # seconds spanned by one block / plot point
+TARE_SAMPLES = 500            # most recent samples averaged for a re-zero
 
 # Motor (counter & DO lines)
 DEV = DEVICE
@@ -48,91 +62,133 @@ DUTY_CYCLE = 0.5
 # ------------------------
 # THREAD CONTROL
 # ------------------------
-stop_event = threading.Event()
-tare_event = threading.Event()     # signal to re-zero (from keyboard 'z')
-motor_lock = threading.Lock()      # protect motor operations if needed
+running = True                     # cleared (via shutdown()) to stop both threads
+cmd_queue = queue.SimpleQueue()    # motor commands: ("cw"/"ccw", freq), ("stop", None), ("quit", None)
+tare_queue = queue.SimpleQueue()   # one item per re-zero request (keyboard 'z')
+
+# Arrow key -> jog command. When several are held, the most recently pressed
+# key sets direction and speed.
+JOG_KEYS = {
+    "down": ("cw", F_FAST),    # CW fast
+    "up": ("ccw", F_FAST),     # CCW fast
+    "right": ("ccw", F_SLOW),  # CCW slow
+    "left": ("cw", F_SLOW),    # CW slow
+}
 
 # ------------------------
 # GLOBALS (will be set at runtime)
 # ------------------------
 zero_offset = 0.0
 
+
+def shutdown():
+    """Stop the plot loop and wake the motor thread so it exits."""
+    global running
+    running = False
+    cmd_queue.put(("quit", None))
+
+
+# ------------------------
+# Keyboard input thread
+# ------------------------
+def input_thread_fn():
+    """
+    Blocks on keyboard events and turns key transitions into motor/tare
+    commands. Auto-repeat key-downs are dropped, so each physical press
+    sends one command.
+    """
+    # One hook for the thread's lifetime: every event lands in the queue, none are dropped
+    events = queue.SimpleQueue()
+    keyboard.hook(events.put)
+    held = set()
+    arrows = []   # held arrow keys, in press order (last = active jog)
+    while running:
+        ev = events.get()
+        # Shift changes the reported name ("z" -> "Z"); normalise so press/release match
+        name = (ev.name or "").lower()
+        if ev.event_type == keyboard.KEY_DOWN:
+            if name in held:
+                continue
+            held.add(name)
+            if name in JOG_KEYS:
+                arrows.append(name)
+                cmd_queue.put(JOG_KEYS[name])
+            elif name == "z":
+                tare_queue.put(None)
+        else:
+            held.discard(name)
+            if name in arrows:
+                arrows.remove(name)
+                # Fall back to the most recently pressed arrow still held, else stop
+                cmd_queue.put(JOG_KEYS[arrows[-1]] if arrows else ("stop", None))
+
+
 # ------------------------
 # Motor control thread
 # ------------------------
 def motor_thread_fn():
     """
     Runs in background. Creates its own NI tasks for DO and pulse generation,
-    watches keyboard state and starts/stops a pulse task for stepping.
+    and starts/stops a pulse task for stepping as jog commands arrive from
+    the input thread.
     """
     pulse_task = None
+    pulse_freq = None   # frequency currently being output (None = stopped)
 
     # Create DO tasks for enable and direction (local to this thread)
     en_task = nidaqmx.Task()
     dir_task = nidaqmx.Task()
+    en_writer = None
     try:
+        # One pulse task for the thread's lifetime; jogs just retune + start/stop it
+        pulse_task = create_pulse_task(F_SLOW)
+
         en_task.do_channels.add_do_chan(EN_LINE, line_grouping=LineGrouping.CHAN_PER_LINE)
         dir_task.do_channels.add_do_chan(DIR_LINE, line_grouping=LineGrouping.CHAN_PER_LINE)
+        en_writer = DigitalSingleChannelWriter(en_task.out_stream)
+        dir_writer = DigitalSingleChannelWriter(dir_task.out_stream)
 
         # Enable driver (EN = LOW typically)
-        en_task.write([False])
+        en_writer.write_one_sample_one_line(False)
+
+        # ESC fires once on key-down and goes through the same shutdown path as
+        # closing the plot window or Ctrl+C
+        keyboard.add_hotkey("esc", shutdown)
+
+        # Arrow keys and 'z' arrive as commands from a dedicated input thread
+        threading.Thread(target=input_thread_fn, daemon=True).start()
 
         print("[MOTOR] Motor thread started. Use arrow keys to jog. ESC to quit. 'z' to tare load cell.")
 
-        while not stop_event.is_set():
-            # Exit if ESC pressed
-            if keyboard.is_pressed("esc"):
-                stop_event.set()
-                break
+        while running:
+            # Sleep until a command arrives; shutdown() posts "quit" to wake us
+            action, freq = cmd_queue.get()
 
-            # Determine requested action from arrow keys
-            # Priority: down/up/right/left (you can adjust)
-            if keyboard.is_pressed("down"):
-                # CW fast
-                dir_task.write([False])  # DIR = LOW -> CW (example)
-                if pulse_task is None:
-                    pulse_task = start_pulse_task(F_FAST)
-            elif keyboard.is_pressed("up"):
-                # CCW fast
-                dir_task.write([True])
-                if pulse_task is None:
-                    pulse_task = start_pulse_task(F_FAST)
-            elif keyboard.is_pressed("right"):
-                # CCW slow
-                dir_task.write([True])
-                if pulse_task is None:
-                    pulse_task = start_pulse_task(F_SLOW)
-            elif keyboard.is_pressed("left"):
-                # CW slow
-                dir_task.write([False])
-                if pulse_task is None:
-                    pulse_task = start_pulse_task(F_SLOW)
-            else:
-                # No key pressed
-                if pulse_task is not None:
+            if action == "quit":
+                break
+            elif action == "stop":
+                if pulse_freq is not None:
                     try:
                         pulse_task.stop()
-                        pulse_task.close()
                     except Exception as e:
                         print("[MOTOR] Error stopping pulse task:", e)
-                    pulse_task = None
-
-            # Check for tare key
-            if keyboard.is_pressed("z"):
-                # Debounce: only signal once per key press
-                tare_event.set()
-                # wait until key released to avoid many triggers
-                while keyboard.is_pressed("z") and not stop_event.is_set():
-                    time.sleep(0.05)
-
-            time.sleep(0.01)  # small loop delay
+                    pulse_freq = None
+            else:
+                # DIR = LOW -> CW, HIGH -> CCW (example)
+                dir_writer.write_one_sample_one_line(action == "ccw")
+                if freq != pulse_freq:
+                    pulse_task.stop()
+                    pulse_task.co_channels[0].co_pulse_freq = freq
+                    pulse_task.start()
+                    pulse_freq = freq
 
     except Exception as e:
         print("[MOTOR] Exception in motor thread:", e)
-        stop_event.set()
+        shutdown()
 
     finally:
         # Clean up
+        keyboard.unhook_all()
         if pulse_task is not None:
             try:
                 pulse_task.stop()
@@ -140,20 +196,21 @@ def motor_thread_fn():
             except Exception:
                 pass
         # Disable driver (EN = HIGH to disable)
-        try:
-            en_task.write([True])
-        except Exception:
-            pass
+        if en_writer is not None:
+            try:
+                en_writer.write_one_sample_one_line(True)
+            except Exception:
+                pass
 
         en_task.close()
         dir_task.close()
         print("[MOTOR] Motor thread exiting, driver disabled.")
 
 
-def start_pulse_task(freq_hz):
+def create_pulse_task(freq_hz):
     """
-    Create and start a counter pulse task at freq_hz.
-    Caller is responsible for stopping/closing returned Task.
+    Create (but do not start) a continuous counter pulse task at freq_hz.
+    Caller is responsible for starting/stopping/closing returned Task.
     """
     t = nidaqmx.Task()
     # create pulse channel
@@ -165,17 +222,43 @@ def start_pulse_task(freq_hz):
         idle_state=Level.LOW
     )
     t.timing.cfg_implicit_timing(sample_mode=AcquisitionType.CONTINUOUS)
-    t.start()
     return t
 
+# ------------------------
+# Block processing (plain NumPy arrays + scalars)
+# ------------------------
+def process_blocks(volts, zero_offset, mv_buf, mv_idx, mv_sum, mv_count):
+    """
+    Smooth block-mean voltages with the moving average and convert them to force.
+    mv_buf is updated in place; returns (forces, mv_idx, mv_sum, mv_count).
+    """
+    out = np.empty(volts.shape[0])
+    for i in range(volts.shape[0]):
+        # drop the value about to be overwritten, add the new one
+        v = volts[i]
+        mv_sum += v - mv_buf[mv_idx]
+        mv_buf[mv_idx] = v
+        mv_idx = (mv_idx + 1) % mv_buf.shape[0]
+        if mv_count < mv_buf.shape[0]:
+            mv_count += 1
+        out[i] = mv_sum / mv_count
+
+    # tare + scale the whole batch in one pass
+    out -= zero_offset
+    out *= SCALE
+    return out, mv_idx, mv_sum, mv_count
+
 # ------------------------
 # Main: load-cell read + plot (runs in main thread)
 # ------------------------
 def main():
     global zero_offset
 
-    # moving average buffer
-    mv_buffer = collections.deque(maxlen=MOVING_AVG_SAMPLES)
+    # moving average: small circular buffer + running sum (O(1) update per block)
+    mv_buf = np.zeros(MOVING_AVG_SAMPLES)
+    mv_idx = 0
+    mv_sum = 0.0
+    mv_count = 0
 
     # Create AI task in main thread
     ai_task = nidaqmx.Task()
@@ -192,19 +275,43 @@ def main():
         ai_task.close()
         return
 
-    # Initial zero calibration (tare)
+    # Hardware-timed continuous acquisition. Every AI_BLOCK samples the driver
+    # calls on_ai_block, which feeds both the tare ring and the plot.
+    ai_task.timing.cfg_samp_clk_timing(
+        rate=AI_RATE,
+        sample_mode=AcquisitionType.CONTINUOUS,
+        samps_per_chan=1000
+    )
+    reader = AnalogSingleChannelReader(ai_task.in_stream)
+    ai_block = np.empty(AI_BLOCK)
+    sample_ring = collections.deque(maxlen=TARE_SAMPLES)      # raw volts, for tare
+    pending_blocks = collections.deque(maxlen=PLOT_HISTORY)   # mean volts, not yet plotted
+
+    def on_ai_block(task_handle, event_type, number_of_samples, callback_data):
+        """DAQmx callback (driver thread): stash the newest block."""
+        try:
+            reader.read_many_sample(ai_block, number_of_samples_per_channel=AI_BLOCK)
+        except Exception as e:
+            print("AI read error:", e)
+            shutdown()
+            return 0
+        sample_ring.extend(ai_block)
+        pending_blocks.append(float(ai_block.mean()))
+        return 0
+
+    ai_task.register_every_n_samples_acquired_into_buffer_event(AI_BLOCK, on_ai_block)
+    ai_task.start()
+
+    # Initial zero calibration (tare) from the first block
     print("Calibrating zero offset... ensure NO LOAD on the load cell.")
-    zero_samples = []
-    try:
-        for _ in range(50):
-            v = ai_task.read()
-            zero_samples.append(v)
-            time.sleep(0.01)
-    except Exception as e:
-        print("Error reading during zero calibration:", e)
-    if zero_samples:
-        zero_offset = sum(zero_samples) / len(zero_samples)
+    deadline = time.time() + 2.0
+    while not pending_blocks and time.time() < deadline:
+        time.sleep(0.01)
+    if pending_blocks:
+        zero_offset = float(np.mean(tuple(sample_ring)))
+        pending_blocks.clear()
     else:
+        print("Error reading during zero calibration: no samples received")
         zero_offset = 0.0
     print(f"Zero offset voltage = {zero_offset:.6f} V")
 
@@ -213,7 +320,7 @@ def main():
     motor_thread.start()
 
     # Prepare plotting
-    plt.ion()
+    plt.style.use("fast")   # line simplification + chunked Agg paths for the live plot
     fig, ax = plt.subplots(figsize=(9, 5))
     line, = ax.plot([], [], lw=1.5)
     ax.set_xlabel("Time (s)")
@@ -221,70 +328,82 @@ def main():
     ax.set_title("Live Load Cell")
     ax.grid(True)
 
-    times = []
-    forces = []
-    start_time = time.time()
-
-    print("Starting data collection. Press ESC to stop. Press 'z' to re-zero (tare).")
-
-    try:
-        while not stop_event.is_set():
-            # Read one or a few samples for averaging
-            try:
-                v = ai_task.read()
-            except Exception as e:
-                print("AI read error:", e)
-                stop_event.set()
-                break
-
-            # apply moving average
-            mv_buffer.append(v)
-            v_avg = sum(mv_buffer) / len(mv_buffer)
-
-            # If tare was requested by motor thread, compute a new zero_offset
-            if tare_event.is_set():
-                # take a few extra samples to compute fresh zero
-                print("[MAIN] Re-zeroing (tare) ... keep load removed")
-                samples = []
-                for _ in range(50):
-                    try:
-                        samples.append(ai_task.read())
-                    except Exception:
-                        pass
-                    time.sleep(0.005)
-                if samples:
-                    zero_offset = sum(samples) / len(samples)
-                    print(f"[MAIN] New zero offset = {zero_offset:.6f} V")
-                tare_event.clear()
-
-            # convert to force
-            force = ((v_avg - zero_offset) / V_FULL_SCALE) * LOAD_FULL_SCALE
-            force *= CAL_FACTOR
-
-            t = time.time() - start_time
-            times.append(t)
-            forces.append(force)
-
-            # Update plot data and view
-            line.set_xdata(times)
-            line.set_ydata(forces)
+    # Preallocated plot data: new points are written at write_idx and the line
+    # gets views of the newest PLOT_HISTORY. When the buffer fills, the newest
+    # PLOT_HISTORY points are moved to the front in one copy. The sample clock is
+    # fixed, so block k ends at k * BLOCK_DT.
+    times = np.empty(PLOT_BUFFER)
+    forces = np.empty(PLOT_BUFFER)
+    write_idx = 0
+    block_count = 0
+    last_rescale = -RESCALE_INTERVAL   # rescale on the first frame
+
+    def update(frame):
+        """Animation timer callback: plot the blocks acquired since the last frame."""
+        global zero_offset
+        nonlocal mv_idx, mv_sum, mv_count, last_rescale, block_count, write_idx
+
+        if not running:
+            cleanup()
+            show_final_plot()
+            return (line,)
+
+        # If tare was requested from the keyboard, zero on the samples already acquired
+        if not tare_queue.empty():
+            while not tare_queue.empty():
+                tare_queue.get_nowait()
+            print("[MAIN] Re-zeroing (tare) ... keep load removed")
+            if sample_ring:
+                zero_offset = float(np.mean(tuple(sample_ring)))
+                print(f"[MAIN] New zero offset = {zero_offset:.6f} V")
+
+        if not pending_blocks:
+            return (line,)
+
+        n_new = len(pending_blocks)
+        volts = np.fromiter((pending_blocks.popleft() for _ in range(n_new)),
+                            dtype=float, count=n_new)
+        new_forces, mv_idx, mv_sum, mv_count = process_blocks(
+            volts, zero_offset, mv_buf, mv_idx, mv_sum, mv_count)
+
+        # n_new <= PLOT_HISTORY (pending_blocks maxlen), so one compaction always makes room
+        if write_idx + n_new > PLOT_BUFFER:
+            times[:PLOT_HISTORY] = times[write_idx - PLOT_HISTORY:write_idx]
+            forces[:PLOT_HISTORY] = forces[write_idx - PLOT_HISTORY:write_idx]
+            write_idx = PLOT_HISTORY
+        end = write_idx + n_new
+        times[write_idx:end] = np.arange(block_count + 1, block_count + n_new + 1) * BLOCK_DT
+        forces[write_idx:end] = new_forces
+        write_idx = end
+        block_count += n_new
+        t = block_count * BLOCK_DT
+
+        # Update plot data (views, no copy)
+        start = max(0, write_idx - PLOT_HISTORY)
+        line.set_data(times[start:write_idx], forces[start:write_idx])
+
+        # Rescale at most once per RESCALE_INTERVAL; a full redraw is only needed
+        # when the limits actually moved (the blit background is re-captured then)
+        if t - last_rescale >= RESCALE_INTERVAL:
+            limits = (ax.get_xlim(), ax.get_ylim())
             ax.relim()
             ax.autoscale_view()
-            fig.canvas.draw()
-            fig.canvas.flush_events()
-
-            # Handle large data arrays: keep last N points to keep GUI responsive
-            if len(times) > 5000:
-                times = times[-2000:]
-                forces = forces[-2000:]
-
-            time.sleep(SAMPLE_INTERVAL)
-
-    except KeyboardInterrupt:
-        stop_event.set()
-    finally:
-        # cleanup
-        stop_event.set()
+            if (ax.get_xlim(), ax.get_ylim()) != limits:
+                fig.canvas.draw()
+            last_rescale = t
+
+        return (line,)
+
+    cleaned_up = False
+    ani = None   # assigned below; the blit setup already calls update() once
+
+    def cleanup():
+        """Stop the motor thread and release the AI task (safe to call twice)."""
+        nonlocal cleaned_up
+        if cleaned_up:
+            return
+        cleaned_up = True
+        shutdown()
         print("\nShutting down...")
 
         try:
@@ -294,19 +413,37 @@ def main():
 
         # Wait for motor thread to end
         motor_thread.join(timeout=2.0)
-        print("All threads joined. Exiting.")
-
-        # show final static plot
-        plt.ioff()
-        plt.figure(figsize=(9,5))
-        plt.plot(times, forces, label="Load (lb)")
-        plt.xlabel("Time (s)")
-        plt.ylabel("Load (lb)")
-        plt.title("Final Load Cell Data")
-        plt.grid(True)
-        plt.legend()
+        print("All threads joined.")
+
+    def show_final_plot():
+        """Freeze the live window into the final static plot (or close it if empty)."""
+        if ani is not None:
+            ani.pause()
+        if write_idx < 2:
+            plt.close(fig)   # nothing to show; lets plt.show() return right away
+            return
+        line.set_label("Load (lb)")
+        ax.set_title("Final Load Cell Data")
+        ax.legend()
+        ax.relim()
+        ax.autoscale_view()
+        fig.canvas.draw_idle()
+
+    print("Starting data collection. Press ESC to stop. Press 'z' to re-zero (tare).")
+
+    # The GUI event loop owns the timing; plt.show() returns once the window closes.
+    # ESC stops acquisition and leaves the window open with the final data.
+    ani = FuncAnimation(fig, update, interval=int(SAMPLE_INTERVAL * 1000),
+                        blit=True, cache_frame_data=False)
+    try:
         plt.show()
 
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cleanup()
+        print("Exiting.")
+
 
 if __name__ == "__main__":
     main()